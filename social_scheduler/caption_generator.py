@@ -1,30 +1,38 @@
 from openai import OpenAI
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from .content_fetcher import ContentItem
+from .profiling import stage
 
 class CaptionGenerator:
     def __init__(self, api_key: str):
         self.client = OpenAI(api_key=api_key)
     
-    def generate_caption(self, content_item: ContentItem, tone: str, include_hashtags: bool = True) -> str:
-        """Generate a caption for social media based on the content item"""
+    def generate_caption(self, content_item: ContentItem, tone: str, include_hashtags: bool = True,
+                         fallback: bool = True) -> Optional[str]:
+        """
+        Generate a caption for social media based on the content item.
+        On failure returns a generic caption, or None if fallback is False.
+        """
         try:
             prompt = self._create_caption_prompt(content_item, tone, include_hashtags)
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a professional social media content creator. Your task is to create engaging, concise captions for Instagram posts."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.7
-            )
+            with stage("caption.openai"):
+                response = self.client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": "You are a professional social media content creator. Your task is to create engaging, concise captions for Instagram posts."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=300,
+                    temperature=0.7
+                )
             
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             print(f"Error generating caption: {e}")
+            if not fallback:
+                return None
             return f"Check out this interesting content: {content_item.title} {content_item.link}"
     
     def _create_caption_prompt(self, content_item: ContentItem, tone: str, include_hashtags: bool) -> str:
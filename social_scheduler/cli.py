@@ -3,22 +3,190 @@ import os
 import json
 from pathlib import Path
 from datetime import datetime
+from dataclasses import asdict
 import time
 
 from .config import Config
-from .content_fetcher import ContentFetcher
+from .content_fetcher import ContentFetcher, ContentItem
 from .image_generator import ImageGenerator
 from .caption_generator import CaptionGenerator
 from .instagram_poster import InstagramPoster
 from .scheduler import Scheduler
+from .jobs import JobStore, STAGES
+from .thumbnails import ThumbnailCache
+from .profiling import RunProfiler
 
 @click.group()
+@click.option('--profile', is_flag=True, help='Profile the command and write a report to ./profiles')
 @click.pass_context
-def cli(ctx):
+def cli(ctx, profile):
     """Social Scheduler - AI-powered social media content scheduler"""
     # Load configuration
     ctx.ensure_object(dict)
     ctx.obj['config'] = Config.from_env()
+    
+    if profile:
+        profiler = RunProfiler(ctx.invoked_subcommand)
+        profiler.start()
+        
+        def write_profile():
+            profile_path, report_path = profiler.stop()
+            click.echo(f"\nProfile written to {profile_path}", err=True)
+            click.echo(f"Stage breakdown written to {report_path}", err=True)
+        
+        # Runs once the subcommand has finished, including on errors and Ctrl+C
+        ctx.call_on_close(write_profile)
+
+def _validate_time(ctx, param, value):
+    """Check that a posting time is in HH:MM format"""
+    if value is not None:
+        try:
+            datetime.strptime(value, "%H:%M")
+        except ValueError:
+            raise click.BadParameter(f"'{value}' is not a valid time, use HH:MM (e.g. 09:00)")
+    return value
+
+def _get_post_job(store, post):
+    """Return the job tracking a scheduled post, creating one for older posts"""
+    job = store.get_job(post['job_id']) if post.get('job_id') else None
+    if job is None:
+        job = store.get_or_create(ContentItem(**post['content_item']))
+    return job
+
+def _generate_image_stage(config, store, job):
+    """Run the image stage, reusing a previous image if it is still on disk"""
+    content_item = ContentItem(**job['content_item'])
+    image_generator = ImageGenerator(config.openai_api_key)
+    prompt = image_generator.create_prompt_from_content(content_item)
+    return store.run_stage(
+        job, "image",
+        lambda: image_generator.generate_image(prompt),
+        is_valid=lambda path: bool(path) and os.path.exists(path)
+    )
+
+def _generate_caption_stage(config, store, job, fresh=False):
+    """
+    Run the caption stage without a fallback caption, so a failed API call is
+    retried on resume. With fresh, a caption from an earlier run is not reused.
+    """
+    content_item = ContentItem(**job['content_item'])
+    caption_generator = CaptionGenerator(config.openai_api_key)
+    return store.run_stage(
+        job, "caption",
+        lambda: caption_generator.generate_caption(content_item, config.content_tone, fallback=False),
+        is_valid=(lambda caption: False) if fresh else None
+    )
+
+def _run_post_job(config, store, job, post_time=None, post_now=False):
+    """Run the remaining stages of a post job, skipping any already completed"""
+    # A posted job is finished; scheduling it again would never go out
+    if store.stage_status(job, "upload") == "done":
+        click.echo(f"Already posted to Instagram (media ID {store.stage_result(job, 'upload')}).")
+        return
+    
+    # Generate image
+    click.echo("\nGenerating image...")
+    image_path = _generate_image_stage(config, store, job)
+    
+    if not image_path:
+        click.echo("Failed to generate image. Aborting.")
+        return
+    
+    click.echo(f"Image generated: {image_path}")
+    
+    # Generate caption
+    click.echo("\nGenerating caption...")
+    caption = _generate_caption_stage(config, store, job)
+    
+    if not caption:
+        click.echo("Failed to generate caption. Aborting.")
+        return
+    
+    click.echo("\nGenerated Caption:")
+    click.echo("=================")
+    click.echo(caption)
+    
+    # If post_now flag is set, post immediately
+    if post_now:
+        click.echo("\nPosting to Instagram...")
+        poster = InstagramPoster(config.instagram_username, config.instagram_password)
+        
+        if store.stage_status(job, "upload") != "done" and not poster.login():
+            click.echo("Failed to login to Instagram. Aborting.")
+            return
+        
+        result = _upload_post(store, job, poster, image_path, caption)
+        
+        if result:
+            click.echo(f"Posted successfully to Instagram! Media ID: {result}")
+        else:
+            click.echo("Failed to post to Instagram.")
+    else:
+        # Schedule the post
+        scheduler = Scheduler(config)
+        post_data = {
+            "content_item": job['content_item'],
+            "image_path": image_path,
+            "caption": caption,
+            "scheduled_time": post_time or config.posting_time,
+            "created_at": datetime.now().isoformat(),
+            "job_id": job['id']
+        }
+        
+        def is_current(post):
+            """Whether a scheduled post still matches this run's image, caption and time"""
+            return (
+                post is not None
+                and post['image_path'] == image_path
+                and post['caption'] == caption
+                and (not post_time or post['scheduled_time'] == post_time)
+            )
+        
+        # Replace an existing scheduled post that is out of date
+        if store.stage_status(job, "schedule") == "done":
+            existing = scheduler.get_scheduled_post(store.stage_result(job, "schedule"))
+            if existing and not is_current(existing):
+                scheduler.delete_scheduled_post(existing['id'])
+        
+        # Schedule again if the earlier post was replaced, posted or deleted since
+        post_id = store.run_stage(
+            job, "schedule",
+            lambda: scheduler.schedule_post(post_data, post_time),
+            is_valid=lambda post_id: is_current(scheduler.get_scheduled_post(post_id))
+        )
+        click.echo(f"\nPost scheduled successfully! Post ID: {post_id}")
+
+def _render_post(config, store, post):
+    """Render the image, caption and upload-ready file for a lookahead post"""
+    job = _get_post_job(store, post)
+    
+    image_path = _generate_image_stage(config, store, job)
+    if not image_path:
+        return None
+    
+    # Write the caption at lead time so it is current when the post goes out
+    caption = _generate_caption_stage(config, store, job, fresh=True)
+    if not caption:
+        return None
+    
+    upload_path = ImageGenerator(config.openai_api_key).prepare_for_upload(image_path)
+    if not upload_path:
+        return None
+    
+    return {"image_path": upload_path, "caption": caption, "job_id": job['id']}
+
+def _upload_post(store, job, poster, image_path, caption):
+    """Upload a post once, checking Instagram first if a previous attempt was interrupted"""
+    interrupted = store.stage_status(job, "upload") in ("running", "failed")
+    
+    def upload():
+        if interrupted:
+            media_id = poster.find_existing_post(caption)
+            if media_id:
+                return media_id
+        return poster.post_content(image_path, caption)
+    
+    return store.run_stage(job, "upload", upload)
 
 @cli.command()
 @click.option('--topics', '-t', help='Comma-separated list of topics to filter content')
@@ -66,7 +234,6 @@ def generate_caption(ctx, title, description, link, source, tone):
     """Generate a caption using OpenAI"""
     config = ctx.obj['config']
     
-    from .content_fetcher import ContentItem
     content_item = ContentItem(
         title=title,
         description=description or "",
@@ -84,13 +251,17 @@ def generate_caption(ctx, title, description, link, source, tone):
 
 @cli.command()
 @click.option('--rss-index', '-r', type=int, help='Index of RSS item to use (from fetch-content)')
-@click.option('--time', '-t', help='Posting time (HH:MM format)')
+@click.option('--time', '-t', callback=_validate_time, help='Posting time (HH:MM format)')
 @click.option('--post-now', '-n', is_flag=True, help='Post immediately instead of scheduling')
+@click.option('--lookahead', is_flag=True, help='Schedule now and render the post shortly before its slot')
 @click.pass_context
-def create_post(ctx, rss_index, time, post_now):
+def create_post(ctx, rss_index, time, post_now, lookahead):
     """Create and schedule a post from RSS content"""
     config = ctx.obj['config']
     
+    if lookahead and post_now:
+        raise click.UsageError("--lookahead schedules the post for later and cannot be combined with --post-now")
+    
     # Fetch content
     fetcher = ContentFetcher(config.rss_feeds)
     content_items = fetcher.fetch_content(config.content_topics, 1)
@@ -114,61 +285,15 @@ def create_post(ctx, rss_index, time, post_now):
             click.echo("Invalid selection")
             return
     
-    # Generate image
-    click.echo("\nGenerating image...")
-    image_generator = ImageGenerator(config.openai_api_key)
-    prompt = image_generator.create_prompt_from_content(content_item)
-    image_path = image_generator.generate_image(prompt)
-    
-    if not image_path:
-        click.echo("Failed to generate image. Aborting.")
+    if lookahead:
+        scheduler = Scheduler(config)
+        post_id = scheduler.schedule_lookahead(asdict(content_item), time, JobStore.make_key(content_item))
+        click.echo(f"\nPost scheduled for lookahead rendering! Post ID: {post_id}")
         return
     
-    click.echo(f"Image generated: {image_path}")
-    
-    # Generate caption
-    click.echo("\nGenerating caption...")
-    caption_generator = CaptionGenerator(config.openai_api_key)
-    caption = caption_generator.generate_caption(content_item, config.content_tone)
-    
-    click.echo("\nGenerated Caption:")
-    click.echo("=================")
-    click.echo(caption)
-    
-    # If post_now flag is set, post immediately
-    if post_now:
-        click.echo("\nPosting to Instagram...")
-        poster = InstagramPoster(config.instagram_username, config.instagram_password)
-        
-        if not poster.login():
-            click.echo("Failed to login to Instagram. Aborting.")
-            return
-        
-        result = poster.post_content(image_path, caption)
-        
-        if result:
-            click.echo(f"Posted successfully to Instagram! Media ID: {result}")
-        else:
-            click.echo("Failed to post to Instagram.")
-    else:
-        # Schedule the post
-        scheduler = Scheduler(config)
-        post_data = {
-            "content_item": {
-                "title": content_item.title,
-                "description": content_item.description,
-                "link": content_item.link,
-                "source": content_item.source,
-                "published": content_item.published
-            },
-            "image_path": image_path,
-            "caption": caption,
-            "scheduled_time": time or config.posting_time,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        post_id = scheduler.schedule_post(post_data, time)
-        click.echo(f"\nPost scheduled successfully! Post ID: {post_id}")
+    store = JobStore()
+    job = store.get_or_create(content_item)
+    _run_post_job(config, store, job, time, post_now)
 
 @cli.command()
 @click.pass_context
@@ -183,12 +308,16 @@ def list_scheduled(ctx):
         click.echo("No scheduled posts found.")
         return
     
+    thumbnail_cache = ThumbnailCache()
+    
     click.echo(f"Found {len(posts)} scheduled posts:")
     for post in posts:
         click.echo(f"\nID: {post['id']}")
         click.echo(f"Title: {post['content_item']['title']}")
         click.echo(f"Scheduled for: {post['scheduled_time']}")
         click.echo(f"Created at: {post['created_at']}")
+        if post.get('image_path') and os.path.exists(post['image_path']):
+            click.echo(f"Preview: {thumbnail_cache.get_thumbnail(post['image_path'])}")
 
 @cli.command()
 @click.argument('post_id')
@@ -206,16 +335,28 @@ def post_now(ctx, post_id):
         click.echo(f"Post with ID {post_id} not found.")
         return
     
-    # Post to Instagram
+    store = JobStore()
+    
+    # Render lookahead posts that have not been rendered yet
+    if not post.get('image_path'):
+        click.echo("Rendering post...")
+        updates = _render_post(config, store, post)
+        if not updates:
+            click.echo("Failed to render post. Aborting.")
+            return
+        post.update(updates)
+    
+    # Post to Instagram, tracked by the post's job so a retry never double-posts
+    job = _get_post_job(store, post)
+    
     click.echo("Posting to Instagram...")
     poster = InstagramPoster(config.instagram_username, config.instagram_password)
-    breakpoint()
     
-    if not poster.login():
+    if store.stage_status(job, "upload") != "done" and not poster.login():
         click.echo("Failed to login to Instagram. Aborting.")
         return
     
-    result = poster.post_content(post['image_path'], post['caption'])
+    result = _upload_post(store, job, poster, post['image_path'], post['caption'])
     
     if result:
         click.echo(f"Posted successfully to Instagram! Media ID: {result}")
@@ -237,6 +378,63 @@ def delete_post(ctx, post_id):
     else:
         click.echo(f"Post {post_id} not found.")
 
+@cli.command()
+@click.option('--interval', default=30, help='Seconds between schedule checks')
+@click.pass_context
+def run_scheduler(ctx, interval):
+    """Run the scheduler: pre-render upcoming posts and publish them at their slot"""
+    config = ctx.obj['config']
+    scheduler = Scheduler(config)
+    store = JobStore()
+    poster = InstagramPoster(config.instagram_username, config.instagram_password)
+    
+    def publish(post):
+        job = _get_post_job(store, post)
+        result = _upload_post(store, job, poster, post['image_path'], post['caption'])
+        if result:
+            click.echo(f"Posted {post['id']} to Instagram! Media ID: {result}")
+        else:
+            click.echo(f"Failed to post {post['id']} to Instagram.")
+        return bool(result)
+    
+    click.echo(f"Scheduler running (pre-rendering {config.prerender_lead_minutes} minutes ahead). Press Ctrl+C to stop.")
+    scheduler.run(lambda post: _render_post(config, store, post), publish, interval)
+
+@cli.command()
+@click.pass_context
+def list_jobs(ctx):
+    """List post jobs and the status of each stage"""
+    store = JobStore()
+    jobs = store.get_jobs()
+    
+    if not jobs:
+        click.echo("No post jobs found.")
+        return
+    
+    click.echo(f"Found {len(jobs)} post jobs:")
+    for job in jobs:
+        click.echo(f"\nID: {job['id']}")
+        click.echo(f"Title: {job['content_item']['title']}")
+        stages = ", ".join(f"{stage}={store.stage_status(job, stage)}" for stage in STAGES)
+        click.echo(f"Stages: {stages}")
+
+@cli.command()
+@click.argument('job_id')
+@click.option('--time', '-t', callback=_validate_time, help='Posting time (HH:MM format)')
+@click.option('--post-now', '-n', is_flag=True, help='Post immediately instead of scheduling')
+@click.pass_context
+def resume_job(ctx, job_id, time, post_now):
+    """Resume an interrupted post job from its last completed stage"""
+    config = ctx.obj['config']
+    store = JobStore()
+    
+    job = store.get_job(job_id)
+    if not job:
+        click.echo(f"Job with ID {job_id} not found.")
+        return
+    
+    _run_post_job(config, store, job, time, post_now)
+
 @cli.command()
 @click.pass_context
 def launch_ui(ctx):
@@ -25,6 +25,10 @@ class Config:
     content_topics: List[str]
     content_tone: str  # professional, casual, humorous, etc.
     
+    # Lookahead pre-rendering of scheduled posts
+    prerender_lead_minutes: int = 60  # how long before its slot a post is rendered
+    prerender_concurrency: int = 2  # max posts rendered at the same time
+    
     @classmethod
     def from_env(cls):
         """Load configuration from environment variables"""
@@ -37,4 +41,6 @@ class Config:
             posting_time=os.getenv("POSTING_TIME", "09:00"),
             content_topics=os.getenv("CONTENT_TOPICS", "technology,business").split(","),
             content_tone=os.getenv("CONTENT_TONE", "professional"),
+            prerender_lead_minutes=int(os.getenv("PRERENDER_LEAD_MINUTES", "60")),
+            prerender_concurrency=int(os.getenv("PRERENDER_CONCURRENCY", "2")),
         ) 
\ No newline at end of file
@@ -1,9 +1,46 @@
 import feedparser
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import random
+import re
+import hashlib
+import struct
+from functools import lru_cache
+from collections import Counter
 from dataclasses import dataclass
 import time  # Add this import for sleep functionality
 
+from .profiling import stage
+
+# MinHash signature layout for near-duplicate detection: 16 bands of 4 rows
+# catch pairs with word overlap (Jaccard) above roughly 0.5 as candidates
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+# Share of title words two items must have in common to be the same story
+MIN_TITLE_OVERLAP = 0.3
+# More entries than this sharing a description means the description is boilerplate
+MAX_SYNDICATED_COPIES = 5
+
+def _words(text: str) -> List[str]:
+    """Split text into lowercase words"""
+    return re.findall(r"\w+", text.lower())
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    """Overlap of two word sets (1.0 when both are empty)"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+@lru_cache(maxsize=65536)
+def _token_minhashes(token: str) -> Tuple[int, ...]:
+    """Hash a feature under every MinHash seed (cached, as feed vocabulary repeats)"""
+    data = token.encode("utf-8")
+    values = []
+    # Each 64-byte blake2b digest yields 16 independent 32-bit hash values
+    for seed in range(MINHASH_BANDS * MINHASH_ROWS // 16):
+        digest = hashlib.blake2b(data, digest_size=64, salt=seed.to_bytes(16, "big")).digest()
+        values.extend(struct.unpack("<16I", digest))
+    return tuple(values)
+
 @dataclass
 class ContentItem:
     title: str
@@ -13,16 +50,20 @@ class ContentItem:
     published: str
 
 class ContentFetcher:
-    def __init__(self, rss_feeds: List[str], request_delay: float = 1.0):
+    def __init__(self, rss_feeds: List[str], request_delay: float = 1.0,
+                 similarity_threshold: Optional[float] = 0.6):
         self.rss_feeds = rss_feeds
         self.request_delay = request_delay  # Delay between requests in seconds
+        # Word overlap above which two items count as the same story (None disables)
+        self.similarity_threshold = similarity_threshold
     
     def fetch_content(self, topics: List[str] = None, limit: int = 5) -> List[ContentItem]:
         """Fetch content from RSS feeds, optionally filtered by topics"""
         all_items = []
         for feed_url in self.rss_feeds:
             try:
-                feed = feedparser.parse(feed_url)
+                with stage("fetch.feedparser"):
+                    feed = feedparser.parse(feed_url)
                 source_name = feed.feed.title if hasattr(feed.feed, 'title') else feed_url
                 
                 for entry in feed.entries:
@@ -46,7 +87,12 @@ class ContentFetcher:
                 print(f"Error fetching feed {feed_url}: {e}")
             
             # Add sleep between requests to avoid rate limiting
-            time.sleep(self.request_delay)
+            with stage("fetch.request_delay"):
+                time.sleep(self.request_delay)
+        
+        # Keep one item per story syndicated across feeds
+        with stage("fetch.deduplicate"):
+            all_items = self._deduplicate(all_items)
         
         # Return random selection if we have more than the limit
         if len(all_items) > limit:
@@ -56,6 +102,73 @@ class ContentFetcher:
     def _clean_description(self, html_content: str) -> str:
         """Remove HTML tags from description"""
         # Simple HTML tag removal - in a real app, use a proper HTML parser
-        import re
-        clean_text = re.sub(r'<.*?>', '', html_content)
-        return clean_text 
\ No newline at end of file
+        with stage("fetch.clean_description"):
+            clean_text = re.sub(r'<.*?>', '', html_content)
+        return clean_text
+    
+    def _deduplicate(self, items: List[ContentItem]) -> List[ContentItem]:
+        """
+        Drop near-duplicate items, keeping the first of each cluster.
+        Items are bucketed by bands of their MinHash signature (LSH), so each
+        item is only compared against the few kept items sharing a band.
+        Candidates must also share enough title words, so a common description
+        alone never merges different stories.
+        """
+        if self.similarity_threshold is None:
+            return items
+        
+        # A description repeated within one feed, or across more entries than a
+        # story is plausibly syndicated to, is boilerplate ("Read more...") rather
+        # than story text, so it is left out of the signature. This also keeps
+        # LSH buckets small, since shared text would put every item in one bucket.
+        feed_description_counts = Counter((item.source, item.description) for item in items)
+        description_counts = Counter(item.description for item in items)
+        
+        num_hashes = MINHASH_BANDS * MINHASH_ROWS
+        buckets: Dict[tuple, List[Tuple[Tuple[int, ...], frozenset]]] = {}
+        kept_items = []
+        
+        for item in items:
+            is_boilerplate = (
+                feed_description_counts[(item.source, item.description)] > 1
+                or description_counts[item.description] > MAX_SYNDICATED_COPIES
+            )
+            title_words = frozenset(_words(item.title))
+            signature = self._minhash(item.title, "" if is_boilerplate else item.description)
+            if signature is None:
+                kept_items.append(item)
+                continue
+            
+            bands = [
+                (band, signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS])
+                for band in range(MINHASH_BANDS)
+            ]
+            
+            is_duplicate = any(
+                sum(x == y for x, y in zip(signature, other)) / num_hashes >= self.similarity_threshold
+                and _jaccard(title_words, other_title_words) >= MIN_TITLE_OVERLAP
+                for key in bands
+                for other, other_title_words in buckets.get(key, ())
+            )
+            if is_duplicate:
+                continue
+            
+            for key in bands:
+                buckets.setdefault(key, []).append((signature, title_words))
+            kept_items.append(item)
+        
+        return kept_items
+    
+    def _minhash(self, title: str, description: str) -> Optional[Tuple[int, ...]]:
+        """
+        Compute the MinHash signature of an item from two-word shingles of the
+        title and description. Title words are also included on their own, so
+        the short title counts for more than the longer description.
+        """
+        title_words = _words(title)
+        features = {f"t:{word}" for word in title_words}
+        for words in (title_words, _words(description)):
+            features.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+        if not features:
+            return None
+        return tuple(map(min, zip(*(_token_minhashes(feature) for feature in features))))
@@ -11,6 +11,20 @@ from .image_generator import ImageGenerator
 from .caption_generator import CaptionGenerator
 from .instagram_poster import InstagramPoster
 from .content_fetcher import ContentItem, ContentFetcher
+from .scheduler import Scheduler
+from .thumbnails import ThumbnailCache
+
+# Previews are served from the thumbnail cache instead of the full-resolution PNGs;
+# created on first use so importing the module does not touch the filesystem
+_thumbnail_cache = None
+
+
+def get_thumbnail_cache():
+    """Return the shared thumbnail cache, creating it on first use"""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
 
 
 def generate_sample_content():
@@ -100,7 +114,7 @@ def create_and_post_content(title, description, prompt, custom_image=None, tone=
     if post_now:
         poster = InstagramPoster(config.instagram_username, config.instagram_password)
         if not poster.login():
-            return "Failed to login to Instagram.", image_path
+            return "Failed to login to Instagram.", preview_image(image_path)
         
         result = poster.post_content(image_path, caption)
         if result:
@@ -110,7 +124,29 @@ def create_and_post_content(title, description, prompt, custom_image=None, tone=
     else:
         result_message = "Image and caption generated but not posted."
     
-    return f"{result_message}\n\nGenerated caption:\n{caption}", image_path
+    return f"{result_message}\n\nGenerated caption:\n{caption}", preview_image(image_path)
+
+
+def preview_image(image_path, size=512):
+    """Return a cached thumbnail for display, falling back to the original image"""
+    return get_thumbnail_cache().get_thumbnail(image_path, size) or image_path
+
+
+def load_scheduled_gallery():
+    """Build gallery entries (thumbnail, label) for the scheduled posts"""
+    scheduler = Scheduler(Config.from_env())
+    posts = sorted(scheduler.get_scheduled_posts(), key=lambda post: post.get('scheduled_at') or "")
+    
+    gallery = []
+    for post in posts:
+        # Lookahead posts have no image until they are pre-rendered
+        if not post.get('image_path') or not os.path.exists(post['image_path']):
+            continue
+        thumbnail = get_thumbnail_cache().get_thumbnail(post['image_path'])
+        if thumbnail:
+            scheduled_for = post.get('scheduled_at') or post['scheduled_time']
+            gallery.append((thumbnail, f"{post['content_item']['title']} ({scheduled_for})"))
+    return gallery
 
 
 def populate_fields():
@@ -176,6 +212,10 @@ def launch_frontend():
                 output = gr.Textbox(label="Result", lines=8)
                 output_image = gr.Image(label="Generated or Uploaded Image")
         
+        with gr.Accordion("Scheduled Posts", open=False):
+            refresh_gallery = gr.Button("🔄 Refresh", variant="secondary")
+            scheduled_gallery = gr.Gallery(label="Scheduled Posts", columns=4)
+        
         # Add a helper function to force enable the button
         def force_enable_button():
             return gr.update(interactive=True)
@@ -209,6 +249,10 @@ def launch_frontend():
             inputs=[title, description, image_prompt, custom_image, tone, post_now],
             outputs=[output, output_image]
         )
+        
+        # Load the scheduled posts gallery on page load and on refresh
+        refresh_gallery.click(fn=load_scheduled_gallery, inputs=[], outputs=scheduled_gallery)
+        app.load(fn=load_scheduled_gallery, inputs=[], outputs=scheduled_gallery)
     
     app.launch(share=True)
 
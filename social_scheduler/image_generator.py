@@ -4,6 +4,9 @@ from typing import Optional
 import os
 from pathlib import Path
 from datetime import datetime
+from PIL import Image
+
+from .profiling import stage
 
 class ImageGenerator:
     def __init__(self, api_key: str):
@@ -18,21 +21,24 @@ class ImageGenerator:
         Returns the path to the saved image
         """
         try:
-            response = self.client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size=size,
-                quality="standard",
-                n=1,
-            )
+            with stage("image.dalle"):
+                response = self.client.images.generate(
+                    model="dall-e-3",
+                    prompt=prompt,
+                    size=size,
+                    quality="standard",
+                    n=1,
+                )
             
             image_url = response.data[0].url
             
             # Download the image
-            image_response = requests.get(image_url)
+            with stage("image.download"):
+                image_response = requests.get(image_url)
             if image_response.status_code == 200:
                 # Create timestamped filename
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                # Microseconds keep names unique when several posts render at once
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
                 # Create a sanitized version of the prompt for the filename
                 prompt_slug = "".join(c if c.isalnum() else "_" for c in prompt[:30]).rstrip("_")
                 filename = f"{timestamp}_{prompt_slug}.png"
@@ -53,4 +59,15 @@ class ImageGenerator:
     
     def create_prompt_from_content(self, content_item) -> str:
         """Create an image generation prompt based on content"""
-        return f"Create a visually appealing social media image representing: {content_item.title}. The image should be professional, engaging, and suitable for Instagram." 
\ No newline at end of file
+        return f"Create a visually appealing social media image representing: {content_item.title}. The image should be professional, engaging, and suitable for Instagram."
+    
+    def prepare_for_upload(self, image_path: str) -> Optional[str]:
+        """Convert an image to the JPEG format Instagram uploads, returning the new path"""
+        try:
+            upload_path = Path(image_path).with_suffix(".jpg")
+            with stage("image.prepare_upload"), Image.open(image_path) as image:
+                image.convert("RGB").save(upload_path, "JPEG", quality=95)
+            return str(upload_path)
+        except Exception as e:
+            print(f"Error preparing image for upload: {e}")
+            return None
@@ -3,6 +3,8 @@ from instagrapi import Client
 from typing import Optional
 import time
 
+from .profiling import stage
+
 class InstagramPoster:
     def __init__(self, username: str, password: str):
         self.username = username
@@ -13,7 +15,8 @@ class InstagramPoster:
     def login(self) -> bool:
         """Login to Instagram"""
         try:
-            self.client.login(self.username, self.password)
+            with stage("instagram.login"):
+                self.client.login(self.username, self.password)
             self.is_logged_in = True
             return True
         except Exception as e:
@@ -27,13 +30,29 @@ class InstagramPoster:
         
         try:
             # Upload photo with caption
-            media = self.client.photo_upload(
-                image_path,
-                caption=caption
-            )
+            with stage("instagram.upload"):
+                media = self.client.photo_upload(
+                    image_path,
+                    caption=caption
+                )
             
             # Return the media ID
             return media.id
         except Exception as e:
             print(f"Error posting to Instagram: {e}")
-            return None 
\ No newline at end of file
+            return None
+    
+    def find_existing_post(self, caption: str, amount: int = 10) -> Optional[str]:
+        """Return the media ID of a recent post with the given caption, if any"""
+        if not self.is_logged_in and not self.login():
+            return None
+        
+        try:
+            with stage("instagram.find_existing"):
+                medias = self.client.user_medias(self.client.user_id, amount)
+            for media in medias:
+                if (media.caption_text or "").strip() == caption.strip():
+                    return media.id
+        except Exception as e:
+            print(f"Error checking existing Instagram posts: {e}")
+        return None
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .content_fetcher import ContentItem
+
+# Stages a post goes through, in order
+STAGES = ("image", "caption", "schedule", "upload")
+
+class JobStore:
+    """Persist the state of each post as a job so interrupted runs can resume"""
+
+    def __init__(self, data_dir: str = "./post_jobs"):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(exist_ok=True)
+
+    @staticmethod
+    def make_key(content_item: ContentItem) -> str:
+        """Build the idempotency key for a content item"""
+        basis = content_item.link or f"{content_item.source}|{content_item.title}"
+        return "job_" + hashlib.sha256(basis.encode("utf-8")).hexdigest()[:16]
+
+    def get_or_create(self, content_item: ContentItem) -> Dict[str, Any]:
+        """Return the existing job for this content item, or start a new one"""
+        job_id = self.make_key(content_item)
+        job = self.get_job(job_id)
+        if job:
+            return job
+
+        now = datetime.now().isoformat()
+        job = {
+            "id": job_id,
+            "content_item": asdict(content_item),
+            "stages": {
+                stage: {
+                    "status": "pending",
+                    "idempotency_key": f"{job_id}:{stage}",
+                    "result": None,
+                    "updated_at": now,
+                }
+                for stage in STAGES
+            },
+            "created_at": now,
+        }
+        self._save_job(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a job by ID"""
+        file_path = self.data_dir / f"{job_id}.json"
+        if not file_path.exists():
+            return None
+        with open(file_path, 'r') as f:
+            return json.load(f)
+
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        """Load all jobs"""
+        jobs = []
+        for file_path in sorted(self.data_dir.glob("*.json")):
+            with open(file_path, 'r') as f:
+                jobs.append(json.load(f))
+        return jobs
+
+    def stage_status(self, job: Dict[str, Any], stage: str) -> str:
+        """Return the status of a stage (pending, running, done or failed)"""
+        return job["stages"][stage]["status"]
+
+    def stage_result(self, job: Dict[str, Any], stage: str) -> Any:
+        """Return the stored result of a stage"""
+        return job["stages"][stage]["result"]
+
+    def run_stage(self, job: Dict[str, Any], stage: str, action: Callable[[], Any],
+                  is_valid: Callable[[Any], bool] = None) -> Any:
+        """
+        Run a stage unless it already completed, recording the outcome.
+        The action signals failure by returning None; a completed result that
+        no longer passes is_valid (e.g. a deleted image) is recomputed.
+        """
+        state = job["stages"][stage]
+        if state["status"] == "done" and (is_valid is None or is_valid(state["result"])):
+            return state["result"]
+
+        # Persist before running so a crash leaves the stage marked as running
+        self._set_stage(job, stage, "running")
+        result = action()
+        if result is None:
+            self._set_stage(job, stage, "failed")
+            return None
+
+        self._set_stage(job, stage, "done", result)
+        return result
+
+    def _set_stage(self, job: Dict[str, Any], stage: str, status: str, result: Any = None):
+        """Update a stage and save the job"""
+        state = job["stages"][stage]
+        state["status"] = status
+        state["result"] = result
+        state["updated_at"] = datetime.now().isoformat()
+        self._save_job(job)
+
+    def _save_job(self, job: Dict[str, Any]):
+        """Write a job atomically so a crash never leaves a partial file"""
+        file_path = self.data_dir / f"{job['id']}.json"
+        tmp_path = file_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, file_path)
@@ -0,0 +1,86 @@
+import cProfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Wall-clock totals per stage as [calls, seconds]; None while profiling is off
+_stage_times: Optional[Dict[str, List]] = None
+_lock = threading.Lock()
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage when profiling is enabled (no-op otherwise)"""
+    # Keep the run's dict so a stage still open when profiling stops records harmlessly
+    times = _stage_times
+    if times is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            entry = times.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+class RunProfiler:
+    """
+    Profile a single CLI run with cProfile and collect per-stage wall-clock times.
+    cProfile only sees the main thread; stage times include background threads.
+    """
+
+    def __init__(self, command: str, output_dir: str = "./profiles"):
+        self.command = command or "cli"
+        self.output_dir = Path(output_dir)
+        self.profiler = cProfile.Profile()
+        self.started_at = None
+
+    def start(self):
+        """Start recording stages and profiling the current thread"""
+        global _stage_times
+        with _lock:
+            _stage_times = {}
+        self.started_at = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self) -> Tuple[str, str]:
+        """Stop profiling and write the profile and stage report, returning their paths"""
+        global _stage_times
+        self.profiler.disable()
+        total = time.perf_counter() - self.started_at
+        with _lock:
+            stage_times, _stage_times = _stage_times, None
+
+        self.output_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_path = self.output_dir / f"{timestamp}_{self.command}"
+
+        profile_path = f"{base_path}.prof"
+        self.profiler.dump_stats(profile_path)
+
+        report_path = f"{base_path}_stages.txt"
+        with open(report_path, 'w') as f:
+            f.write(self._format_report(stage_times, total))
+
+        return profile_path, report_path
+
+    def _format_report(self, stage_times: Dict[str, List], total: float) -> str:
+        """Format the wall-clock breakdown, slowest stage first"""
+        lines = [
+            f"Command: {self.command}",
+            f"Total wall time: {total:.3f}s",
+            "Stages are nested (e.g. scheduler.prerender includes image.dalle),",
+            "so the % of run column can add up to more than 100%.",
+            "",
+            f"{'Stage':<32}{'Calls':>8}{'Seconds':>12}{'% of run':>10}",
+        ]
+        for name, (calls, seconds) in sorted(stage_times.items(), key=lambda item: -item[1][1]):
+            share = 100 * seconds / total if total else 0
+            lines.append(f"{name:<32}{calls:>8}{seconds:>12.3f}{share:>9.1f}%")
+        return "\n".join(lines) + "\n"
@@ -1,36 +1,74 @@
 import schedule
 import time
 import datetime
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import json
+import uuid
 import os
 from pathlib import Path
 
+from .profiling import stage
+
 class Scheduler:
     def __init__(self, config):
         self.config = config
         self.scheduled_jobs = {}
         self.data_dir = Path("./scheduled_posts")
         self.data_dir.mkdir(exist_ok=True)
+        # Background pool for lookahead pre-rendering, created on first use
+        self._prerender_pool = None
+        self._prerendering = set()
     
     def schedule_post(self, post_data: Dict[str, Any], post_time: str = None) -> str:
         """Schedule a post for a specific time"""
-        # Generate a unique ID for this post
-        post_id = f"post_{int(time.time())}"
+        # Generate a unique ID for this post; the random suffix keeps posts
+        # scheduled in the same second from overwriting each other
+        post_id = f"post_{int(time.time())}_{uuid.uuid4().hex[:8]}"
         
         # Use provided time or default from config
         post_time = post_time or self.config.posting_time
+        post_data.setdefault("scheduled_at", self._next_slot(post_time).isoformat())
         
         # Save post data
         self._save_post_data(post_id, post_data)
         
         return post_id
     
+    def schedule_lookahead(self, content_item: Dict[str, Any], post_time: str = None,
+                           job_id: str = None) -> str:
+        """
+        Schedule a post from its content item alone; the image and caption
+        are rendered shortly before the slot by prerender_pending
+        """
+        post_time = post_time or self.config.posting_time
+        post_data = {
+            "content_item": content_item,
+            "image_path": None,
+            "caption": None,
+            "scheduled_time": post_time,
+            "created_at": datetime.datetime.now().isoformat(),
+            "lookahead": True,
+            "job_id": job_id
+        }
+        return self.schedule_post(post_data, post_time)
+    
+    def _next_slot(self, post_time: str, now: datetime.datetime = None) -> datetime.datetime:
+        """Return the next occurrence of an HH:MM posting time (raises ValueError if malformed)"""
+        now = now or datetime.datetime.now()
+        parsed = datetime.datetime.strptime(post_time, "%H:%M")
+        slot = now.replace(hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0)
+        if slot < now:
+            slot += datetime.timedelta(days=1)
+        return slot
+    
     def _save_post_data(self, post_id: str, post_data: Dict[str, Any]):
-        """Save post data to a file"""
+        """Save post data to a file atomically, as pre-render threads write while the loop reads"""
         file_path = self.data_dir / f"{post_id}.json"
-        with open(file_path, 'w') as f:
+        tmp_path = file_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(post_data, f)
+        os.replace(tmp_path, file_path)
     
     def get_scheduled_posts(self):
         """Get all scheduled posts"""
@@ -42,10 +80,105 @@ class Scheduler:
                 posts.append(post_data)
         return posts
     
+    def get_scheduled_post(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """Get a scheduled post by ID"""
+        file_path = self.data_dir / f"{post_id}.json"
+        if not file_path.exists():
+            return None
+        with open(file_path, 'r') as f:
+            post_data = json.load(f)
+        post_data['id'] = post_id
+        return post_data
+    
     def delete_scheduled_post(self, post_id: str) -> bool:
         """Delete a scheduled post"""
         file_path = self.data_dir / f"{post_id}.json"
         if file_path.exists():
             file_path.unlink()
             return True
-        return False 
\ No newline at end of file
+        return False
+    
+    def get_posts_to_prerender(self, now: datetime.datetime = None) -> List[Dict[str, Any]]:
+        """Get unrendered posts whose slot is within the pre-render lead time"""
+        now = now or datetime.datetime.now()
+        lead = datetime.timedelta(minutes=self.config.prerender_lead_minutes)
+        return [
+            post for post in self.get_scheduled_posts()
+            if not post.get('image_path') and post.get('scheduled_at')
+            and datetime.datetime.fromisoformat(post['scheduled_at']) - lead <= now
+        ]
+    
+    def get_due_posts(self, now: datetime.datetime = None) -> List[Dict[str, Any]]:
+        """Get rendered posts whose slot has arrived"""
+        now = now or datetime.datetime.now()
+        return [
+            post for post in self.get_scheduled_posts()
+            if post.get('image_path') and post.get('scheduled_at')
+            and datetime.datetime.fromisoformat(post['scheduled_at']) <= now
+        ]
+    
+    def prerender_pending(self, render: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                          now: datetime.datetime = None) -> int:
+        """
+        Start rendering posts that entered their lead window in the background,
+        at most prerender_concurrency at a time. render returns the fields to
+        store on the post (image_path, caption, ...) or None on failure, in
+        which case the post is retried on a later call.
+        Returns the number of posts submitted.
+        """
+        if self._prerender_pool is None:
+            self._prerender_pool = ThreadPoolExecutor(max_workers=self.config.prerender_concurrency)
+        
+        submitted = 0
+        for post in self.get_posts_to_prerender(now):
+            # Posts sharing a job are rendered one at a time, as they write the same job file
+            render_key = post.get('job_id') or post['id']
+            if render_key in self._prerendering:
+                continue
+            self._prerendering.add(render_key)
+            self._prerender_pool.submit(self._prerender_post, render, post, render_key)
+            submitted += 1
+        return submitted
+    
+    def _prerender_post(self, render: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]], post: Dict[str, Any],
+                        render_key: str):
+        """Render a single post and store the result"""
+        post_id = post['id']
+        try:
+            with stage("scheduler.prerender"):
+                updates = render(post)
+            # Skip posts deleted or published while rendering
+            if updates and (self.data_dir / f"{post_id}.json").exists():
+                post.update(updates)
+                post_data = {key: value for key, value in post.items() if key != 'id'}
+                self._save_post_data(post_id, post_data)
+        except Exception as e:
+            print(f"Error pre-rendering post {post_id}: {e}")
+        finally:
+            self._prerendering.discard(render_key)
+    
+    def run(self, render: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+            publish: Callable[[Dict[str, Any]], bool], interval: int = 30):
+        """
+        Run the scheduling loop: pre-render upcoming posts in the background
+        and publish rendered posts once their slot arrives. publish returns
+        True once a post is live, after which it is removed from the schedule.
+        """
+        def tick():
+            self.prerender_pending(render)
+            for post in self.get_due_posts():
+                with stage("scheduler.publish"):
+                    published = publish(post)
+                if published:
+                    self.delete_scheduled_post(post['id'])
+        
+        schedule.every(interval).seconds.do(tick)
+        tick()
+        try:
+            while True:
+                schedule.run_pending()
+                time.sleep(1)
+        finally:
+            schedule.clear()
+            if self._prerender_pool is not None:
+                self._prerender_pool.shutdown(wait=False)
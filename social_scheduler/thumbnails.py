@@ -0,0 +1,59 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from PIL import Image
+
+class ThumbnailCache:
+    """Small WebP previews of generated images, created once per image content"""
+
+    def __init__(self, cache_dir: str = "./thumbnails", size: int = 320, quality: int = 80):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.size = size
+        self.quality = quality
+        # Content hashes by (path, mtime, file size), so unchanged files are not re-read
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def get_thumbnail(self, image_path: str, size: int = None) -> Optional[str]:
+        """
+        Return the path of a thumbnail for the image, creating it if needed.
+        Thumbnails are keyed by the source path and the image content, so
+        editing or replacing the source image produces a fresh thumbnail and
+        removes the stale one.
+        """
+        size = size or self.size
+        try:
+            path_key = hashlib.sha256(os.path.abspath(image_path).encode("utf-8")).hexdigest()[:16]
+            content_hash = self._content_hash(image_path)
+            thumbnail_path = self.cache_dir / f"{path_key}_{content_hash}_{size}.webp"
+            if not thumbnail_path.exists():
+                # Drop thumbnails of earlier versions of this image, at every size
+                for cached_path in self.cache_dir.glob(f"{path_key}_*.webp"):
+                    if not cached_path.name.startswith(f"{path_key}_{content_hash}_"):
+                        cached_path.unlink(missing_ok=True)
+                with Image.open(image_path) as image:
+                    image.thumbnail((size, size))
+                    if image.mode not in ("RGB", "RGBA"):
+                        image = image.convert("RGBA")
+                    # Write to a temporary file first so readers never see a partial thumbnail
+                    tmp_path = thumbnail_path.with_suffix(f".{threading.get_ident()}.tmp")
+                    image.save(tmp_path, "WEBP", quality=self.quality)
+                os.replace(tmp_path, thumbnail_path)
+            return str(thumbnail_path)
+        except Exception as e:
+            print(f"Error creating thumbnail for {image_path}: {e}")
+            return None
+
+    def _content_hash(self, image_path: str) -> str:
+        """Hash the image content, reusing the last hash while the file is unchanged"""
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        if key not in self._hashes:
+            digest = hashlib.sha256()
+            with open(image_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            self._hashes[key] = digest.hexdigest()[:16]
+        return self._hashes[key]